@@ -0,0 +1,18 @@
+from janis_pipelines.tools.bcftools import (
+    SortAndCompressVcf_1_9,
+    SliceVcfByIntervals_1_9,
+)
+from janis_pipelines.tools.bwa import BwaAlignAndMarkDuplicates_0_7_17
+from janis_pipelines.tools.fastp import Fastp_0_23_2
+from janis_pipelines.tools.gatk4 import (
+    Gatk4SplitIntervals_4_1_3,
+    Gatk4GatherPileupSummaries_4_1_8,
+)
+from janis_pipelines.tools.mosdepth import Mosdepth_0_3_3
+from janis_pipelines.tools.parabricks import (
+    ParabricksBqsr_4_0,
+    ParabricksMutectCaller_4_0,
+    ParabricksSomaticVariantCaller_4_0,
+)
+from janis_pipelines.tools.samtools import SamToolsStats_1_9
+from janis_pipelines.tools.tar import TarShards_1_30
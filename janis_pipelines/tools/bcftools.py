@@ -0,0 +1,228 @@
+from datetime import date
+from typing import Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolArgument,
+    ToolMetadata,
+    Array,
+    String,
+    Int,
+    Filename,
+    InputSelector,
+    UnionType,
+    WildcardSelector,
+    CpuSelector,
+)
+from janis_bioinformatics.data_types import Vcf, CompressedVcf, VcfTabix, Bed
+from janis_bioinformatics.tools import BioinformaticsTool
+
+
+class SortAndCompressVcf_1_9(BioinformaticsTool):
+    def tool(self):
+        return "SortAndCompressVcf"
+
+    def friendly_name(self):
+        return "BCFTools: Sort and compress VCF"
+
+    def tool_provider(self):
+        return "bcftools"
+
+    def version(self):
+        return "v1.9"
+
+    def container(self):
+        # bioconda's bcftools depends on htslib, so bgzip is available too
+        return "quay.io/biocontainers/bcftools:1.9--ha228f0b_4"
+
+    def base_command(self):
+        return None
+
+    def cpus(self, hints: Dict[str, Any]):
+        return 1
+
+    def memory(self, hints: Dict[str, Any]):
+        return 8
+
+    def arguments(self):
+        return [
+            # The command may be run by a POSIX sh without pipefail, so each stage of
+            # the pipe records its own failure, otherwise a failed sort would still
+            # leave (empty or partial) VCFs and exit 0.
+            ToolArgument("{ bcftools", position=0, shell_quote=False),
+            ToolArgument("sort", position=1, shell_quote=False),
+            ToolArgument("--output-type", position=2, shell_quote=False),
+            ToolArgument("v", position=3, shell_quote=False),
+            ToolArgument("|| echo sort >> failed; } |", position=6, shell_quote=False),
+            ToolArgument("{ tee", position=7, shell_quote=False),
+            ToolArgument("|| echo tee >> failed; } |", position=9, shell_quote=False),
+            ToolArgument("{ bgzip", position=10, shell_quote=False),
+            ToolArgument("-c", position=11, shell_quote=False),
+            ToolArgument(">", position=12, shell_quote=False),
+            ToolArgument(
+                "|| echo bgzip >> failed; };"
+                ' if [ -e failed ]; then echo "Failed:" `cat failed` >&2; exit 1; fi',
+                position=14,
+                shell_quote=False,
+            ),
+        ]
+
+    def inputs(self):
+        return [
+            ToolInput(
+                "vcf",
+                UnionType(Vcf, CompressedVcf),
+                position=5,
+                doc="The VCF file to sort",
+            ),
+            # Hold the whole (merged) VCF in memory where possible, leaving headroom in
+            # the 8G task. Anything that spills goes to the working directory rather than
+            # /tmp or /dev/shm, which are often small inside a container.
+            ToolInput(
+                "maxMem",
+                String(optional=True),
+                default="6G",
+                prefix="--max-mem",
+                position=4,
+                doc="(-m) maximum memory to use [768M]",
+            ),
+            ToolInput(
+                "tempDir",
+                String(optional=True),
+                default="bcftools-sort.XXXXXX",
+                prefix="--temp-dir",
+                position=4,
+                doc="(-T) temporary files [/tmp/bcftools-sort.XXXXXX/]",
+            ),
+            ToolInput(
+                "compressionLevel",
+                Int(optional=True),
+                prefix="-l",
+                position=11,
+                doc="(bgzip --compress-level) Compression level of the bgzipped VCF, from 0 "
+                "to 9, where 1 is the fastest [default: 6]",
+            ),
+            ToolInput(
+                "outputFilename",
+                Filename(suffix=".sorted", extension=".vcf"),
+                position=8,
+                doc="Filename of the sorted (uncompressed) VCF",
+            ),
+            ToolInput(
+                "compressedOutputFilename",
+                Filename(suffix=".sorted", extension=".vcf.gz"),
+                position=13,
+                doc="Filename of the sorted and bgzipped VCF",
+            ),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput(
+                "out", CompressedVcf, glob=InputSelector("compressedOutputFilename")
+            ),
+            ToolOutput("out_uncompressed", Vcf, glob=InputSelector("outputFilename")),
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            keywords=["BCFTools", "sort", "bgzip"],
+            documentationUrl="https://samtools.github.io/bcftools/bcftools.html#sort",
+            documentation="""\
+Sort a VCF with bcftools, and stream the sorted records through tee to produce both
+the uncompressed VCF and its bgzipped equivalent in one pass. This replaces the
+bgzip -> bcftools sort -> uncompress sequence of steps, which writes and re-reads
+the whole VCF three times.""",
+        )
+
+
+class SliceVcfByIntervals_1_9(BioinformaticsTool):
+    def tool(self):
+        return "SliceVcfByIntervals"
+
+    def friendly_name(self):
+        return "BCFTools: Slice VCF by intervals"
+
+    def tool_provider(self):
+        return "bcftools"
+
+    def version(self):
+        return "v1.9"
+
+    def container(self):
+        return "quay.io/biocontainers/bcftools:1.9--ha228f0b_4"
+
+    def base_command(self):
+        return None
+
+    def cpus(self, hints: Dict[str, Any]):
+        # the slices together recompress most of the VCF (all of it for a WGS)
+        return 4
+
+    def memory(self, hints: Dict[str, Any]):
+        return 4
+
+    def arguments(self):
+        return [
+            # The interval_list header (@) lines are dropped, leaving 1-based, inclusive
+            # regions (regions.txt, not .bed) that bcftools reads through the tabix index.
+            # The slices are numbered (and so globbed) in the same order as the intervals.
+            # A loop only returns the status of its last iteration, so every slice that
+            # fails is recorded and the task fails once the loop is done.
+            ToolArgument(
+                "mkdir slices && i=0 && for f in", position=0, shell_quote=False
+            ),
+            ToolArgument(
+                "; do i=`expr $i + 1`; n=`printf %05d $i`;"
+                " grep -v '^@' \"$f\" | cut -f1-3 > regions.txt;"
+                " bcftools view -R regions.txt -O z",
+                position=2,
+                shell_quote=False,
+            ),
+            ToolArgument(CpuSelector(), prefix="--threads", position=3),
+            ToolArgument("-o slices/$n.vcf.gz", position=4, shell_quote=False),
+            ToolArgument(
+                '|| echo "$n ($f)" >> failed; done;'
+                ' if [ -e failed ]; then echo "Failed slices:" `cat failed` >&2; exit 1; fi',
+                position=6,
+                shell_quote=False,
+            ),
+        ]
+
+    def inputs(self):
+        return [
+            ToolInput(
+                "intervals",
+                Array(Bed),
+                position=1,
+                shell_quote=False,
+                doc="The (non-overlapping) intervals of each shard, as GATK interval lists",
+            ),
+            ToolInput("vcf", VcfTabix, position=5, doc="The VCF to slice"),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput(
+                "out",
+                Array(CompressedVcf),
+                glob=WildcardSelector("slices/*.vcf.gz"),
+                doc="The records of the VCF that overlap each set of intervals. These "
+                "aren't indexed, as secondary files can't be globbed (in WDL).",
+            )
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            keywords=["BCFTools", "view", "regions", "tabix"],
+            documentationUrl="https://samtools.github.io/bcftools/bcftools.html#view",
+            documentation="""\
+Slice a (large) tabix indexed VCF into one small VCF for each shard of a scatter.
+The VCF is only localised once, rather than every shard localising the whole file to
+read a few of its regions.""",
+        )
@@ -0,0 +1,181 @@
+from datetime import date
+from typing import Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolArgument,
+    ToolMetadata,
+    Array,
+    String,
+    Filename,
+    InputSelector,
+    CpuSelector,
+    StringFormatter,
+    get_value_for_hints_and_ordered_resource_tuple,
+)
+from janis_bioinformatics.data_types import FastaWithDict, FastqGzPair, BamBai
+from janis_bioinformatics.tools import BioinformaticsTool
+from janis_bioinformatics.tools.common.bwamem_samtoolsview import (
+    BWA_CORES_TUPLE,
+    BWA_MEM_TUPLE,
+)
+
+
+class BwaAlignAndMarkDuplicates_0_7_17(BioinformaticsTool):
+    def tool(self):
+        return "BwaAlignAndMarkDuplicates"
+
+    def friendly_name(self):
+        return "BWA MEM + Samtools: Align and mark duplicates"
+
+    def tool_provider(self):
+        return "common"
+
+    def version(self):
+        return "0.7.17|1.9"
+
+    def container(self):
+        return "michaelfranklin/bwasamtools:0.7.17-1.9"
+
+    def base_command(self):
+        return None
+
+    def cpus(self, hints: Dict[str, Any]):
+        # every lane goes through the one bwa process, so rather than being limited
+        # by the number of lanes, scale the threads with the size of the sample
+        val = get_value_for_hints_and_ordered_resource_tuple(hints, BWA_CORES_TUPLE)
+        if val:
+            return val
+        return 16
+
+    def memory(self, hints: Dict[str, Any]):
+        # bwa's index and buffers, plus 1G for each samtools sort thread
+        val = get_value_for_hints_and_ordered_resource_tuple(hints, BWA_MEM_TUPLE)
+        return (val or 16) + self.cpus(hints)
+
+    def arguments(self):
+        return [
+            # split the (R1, R2) pairs into a list of R1s and R2s, and stream each
+            # (decompressed) list into bwa through a named pipe. gzip (unlike cat)
+            # fails on a corrupt or truncated lane, rather than bwa seeing an early EOF.
+            ToolArgument("; set --", position=1, shell_quote=False),
+            ToolArgument(
+                "; R1=''; R2=''; while [ $# -gt 0 ]; do R1=\"$R1 $1\"; R2=\"$R2 $2\"; shift 2; done;"
+                " mkfifo reads_R1.fastq reads_R2.fastq;"
+                " gzip -dc $R1 > reads_R1.fastq & C1=$!; gzip -dc $R2 > reads_R2.fastq & C2=$!;",
+                position=3,
+                shell_quote=False,
+            ),
+            # The command may be run by a POSIX sh without pipefail, so each stage of
+            # the pipe records its own failure, otherwise a truncated stream (eg: bwa
+            # being killed) would still produce a (truncated) bam and exit 0.
+            ToolArgument("{ bwa", position=4, shell_quote=False),
+            ToolArgument("mem", position=5, shell_quote=False),
+            ToolArgument(
+                StringFormatter(
+                    "@RG\\tID:{name}\\tSM:{name}\\tLB:{name}\\tPL:{pl}",
+                    name=InputSelector("sampleName"),
+                    pl=InputSelector("platformTechnology"),
+                ),
+                prefix="-R",
+                position=6,
+                doc="Complete read group header line, every lane is given the same read group",
+            ),
+            ToolArgument(CpuSelector(), prefix="-t", position=6, shell_quote=False),
+            ToolArgument(
+                "-K 100000000",
+                position=6,
+                shell_quote=False,
+                doc="Process a fixed number of bases in each batch, so the alignments "
+                "don't depend on the number of threads",
+            ),
+            ToolArgument(
+                "-M",
+                position=6,
+                shell_quote=False,
+                doc="Mark shorter split hits as secondary (for Picard compatibility).",
+            ),
+            ToolArgument(
+                "reads_R1.fastq reads_R2.fastq || echo bwa >> failed; }",
+                position=8,
+                shell_quote=False,
+            ),
+            # bwa emits reads grouped by name, which is what fixmate needs to add
+            # the mate scores markdup uses. Intermediate streams are uncompressed BAM.
+            ToolArgument("| { samtools fixmate -m", position=9, shell_quote=False),
+            ToolArgument("-O bam,level=0", position=10, shell_quote=False),
+            ToolArgument(CpuSelector(), prefix="-@", position=10, shell_quote=False),
+            ToolArgument(
+                "- - || echo fixmate >> failed; }", position=11, shell_quote=False
+            ),
+            ToolArgument(
+                "| { samtools sort -l 0 -m 1G", position=12, shell_quote=False
+            ),
+            ToolArgument(CpuSelector(), prefix="-@", position=13, shell_quote=False),
+            ToolArgument(
+                "-T sorttmp - || echo sort >> failed; }", position=14, shell_quote=False
+            ),
+            ToolArgument("| { samtools markdup", position=15, shell_quote=False),
+            ToolArgument(CpuSelector(), prefix="-@", position=16, shell_quote=False),
+            # if bwa failed before opening the named pipes, gzip would block forever
+            ToolArgument(
+                '- "$OUT" || echo markdup >> failed; };'
+                " if [ -e failed ]; then kill $C1 $C2 2> /dev/null || true; fi;"
+                " wait $C1 || echo gzip R1 >> failed; wait $C2 || echo gzip R2 >> failed;"
+                ' if [ -e failed ]; then echo "Failed:" `cat failed` >&2; exit 1; fi;'
+                ' samtools index "$OUT"',
+                position=17,
+                shell_quote=False,
+            ),
+        ]
+
+    def inputs(self):
+        return [
+            ToolInput(
+                "reads",
+                Array(FastqGzPair),
+                position=2,
+                shell_quote=False,
+                doc="All of the FastqGz pairs (lanes / top-ups) of one sample",
+            ),
+            ToolInput("reference", FastaWithDict, position=7, shell_quote=False),
+            ToolInput("sampleName", String, doc="Used to construct the read group"),
+            ToolInput(
+                "platformTechnology",
+                String(optional=True),
+                default="ILLUMINA",
+                doc="(ReadGroup: PL) Used to construct the readGroupHeaderLine",
+            ),
+            ToolInput(
+                "outputFilename",
+                Filename(
+                    prefix=InputSelector("sampleName"),
+                    suffix=".markduped",
+                    extension=".bam",
+                ),
+                prefix="OUT=",
+                separate_value_from_prefix=False,
+                position=0,
+                shell_quote=False,
+                doc="Filename of the duplicate marked bam, it's referenced as $OUT in the command",
+            ),
+        ]
+
+    def outputs(self):
+        return [ToolOutput("out", BamBai, glob=InputSelector("outputFilename"))]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            keywords=["bwa", "samtools", "align", "markdup"],
+            documentationUrl="http://www.htslib.org/algorithms/duplicate.html",
+            documentation="""\
+Align every FASTQ pair of a sample with BWA MEM, and stream the alignments straight through
+samtools fixmate, sort and markdup so the only bam written to disk is the final, coordinate
+sorted and duplicate marked bam (and its index).
+
+This replaces aligning and sorting each pair into its own bam, merging those bams and then
+marking duplicates with Picard, which wrote and re-read the whole bam several times.""",
+        )
@@ -0,0 +1,134 @@
+from datetime import date
+from typing import Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolArgument,
+    ToolMetadata,
+    Int,
+    Boolean,
+    InputSelector,
+    CpuSelector,
+)
+from janis_core.operators.standard import ReplaceOperator
+from janis_bioinformatics.data_types import FastqGzPair
+from janis_bioinformatics.tools import BioinformaticsTool
+from janis_unix.data_types import HtmlFile, JsonFile
+
+# every pair in a (scattered) sample gets its own outputs, so they're named after the R1 fastq.
+# The directory is stripped with a replace as janis' CWL basename() doesn't apply to a path
+_PREFIX = ReplaceOperator(
+    ReplaceOperator(InputSelector("reads")[0], "^.*/", ""), "\\.f(ast)?q\\.gz$", ""
+)
+
+
+class Fastp_0_23_2(BioinformaticsTool):
+    def tool(self):
+        return "fastp"
+
+    def friendly_name(self):
+        return "fastp"
+
+    def tool_provider(self):
+        return "OpenGene"
+
+    def version(self):
+        return "0.23.2"
+
+    def container(self):
+        return "quay.io/biocontainers/fastp:0.23.2--h79da9fb_0"
+
+    def base_command(self):
+        return "fastp"
+
+    def cpus(self, hints: Dict[str, Any]):
+        # fastp's throughput levels off well before 16 worker threads
+        return 8
+
+    def memory(self, hints: Dict[str, Any]):
+        return 8
+
+    def arguments(self):
+        return [
+            ToolArgument(InputSelector("reads")[0], prefix="--in1"),
+            ToolArgument(InputSelector("reads")[1], prefix="--in2"),
+            ToolArgument(_PREFIX + "-R1.fastq.gz", prefix="--out1"),
+            ToolArgument(_PREFIX + "-R2.fastq.gz", prefix="--out2"),
+            ToolArgument(_PREFIX + ".fastp.html", prefix="--html"),
+            ToolArgument(_PREFIX + ".fastp.json", prefix="--json"),
+            ToolArgument(CpuSelector(), prefix="--thread"),
+        ]
+
+    def inputs(self):
+        return [
+            ToolInput("reads", FastqGzPair),
+            ToolInput(
+                "detectAdapterForPe",
+                Boolean(optional=True),
+                default=True,
+                prefix="--detect_adapter_for_pe",
+                doc="Enable adapter sequence auto-detection for paired end data, by default "
+                "fastp only detects adapters by the overlap of the two reads.",
+            ),
+            ToolInput(
+                "cutTail",
+                Boolean(optional=True),
+                prefix="--cut_tail",
+                doc="(-3) Move a sliding window from the 3' tail, dropping the bases in the "
+                "window while its mean quality is below cutMeanQuality.",
+            ),
+            ToolInput(
+                "cutMeanQuality",
+                Int(optional=True),
+                prefix="--cut_mean_quality",
+                doc="(-M) The mean quality requirement for the sliding window (default: 20)",
+            ),
+            ToolInput(
+                "lengthRequired",
+                Int(optional=True),
+                prefix="--length_required",
+                doc="(-l) Reads shorter than this are discarded (default: 15)",
+            ),
+            ToolInput(
+                "compression",
+                Int(optional=True),
+                prefix="--compression",
+                doc="(-z) Compression level for the gzipped output (1-9, default: 4)",
+            ),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput(
+                "out",
+                FastqGzPair,
+                selector=[
+                    _PREFIX + "-R1.fastq.gz",
+                    _PREFIX + "-R2.fastq.gz",
+                ],
+            ),
+            ToolOutput(
+                "out_html",
+                HtmlFile,
+                selector=_PREFIX + ".fastp.html",
+            ),
+            ToolOutput(
+                "out_json",
+                JsonFile,
+                selector=_PREFIX + ".fastp.json",
+            ),
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            institution="OpenGene",
+            keywords=["fastp", "qc", "trim", "adapters"],
+            documentationUrl="https://github.com/OpenGene/fastp",
+            documentation="""\
+A multithreaded FASTQ preprocessor. In a single pass over a FASTQ pair, fastp detects and
+trims adapters, trims low quality tails, filters short reads and writes HTML and JSON
+quality control reports.""",
+        )
@@ -0,0 +1,182 @@
+from abc import ABC
+from datetime import date
+from typing import Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolArgument,
+    ToolMetadata,
+    Array,
+    String,
+    Int,
+    Filename,
+    InputSelector,
+    WildcardSelector,
+)
+from janis_bioinformatics.data_types import FastaWithDict, Bed
+from janis_bioinformatics.tools.gatk4.gatk4toolbase import Gatk4ToolBase
+from janis_bioinformatics.tools.gatk4.versions import Gatk_4_1_3_0, Gatk_4_1_8_1
+from janis_unix.data_types import TextFile
+
+
+class Gatk4SplitIntervalsBase(Gatk4ToolBase, ABC):
+    @classmethod
+    def gatk_command(cls):
+        return "SplitIntervals"
+
+    def tool(self):
+        return "Gatk4SplitIntervals"
+
+    def friendly_name(self):
+        return "GATK4: SplitIntervals"
+
+    def cpus(self, hints: Dict[str, Any]):
+        return 1
+
+    def memory(self, hints: Dict[str, Any]):
+        return 4
+
+    def inputs(self):
+        return [
+            *super().inputs(),
+            ToolInput(
+                "reference",
+                FastaWithDict,
+                prefix="--reference",
+                doc="(-R) Reference sequence",
+            ),
+            ToolInput(
+                "intervals",
+                Array(Bed, optional=True),
+                prefix="--intervals",
+                prefix_applies_to_all_elements=True,
+                doc="(-L) One or more genomic intervals over which to operate, "
+                "if not provided the whole reference is split.",
+            ),
+            ToolInput(
+                "scatterCount",
+                Int(optional=True),
+                prefix="--scatter-count",
+                doc="(-scatter) Scatter count: number of output interval files to split into",
+            ),
+            ToolInput(
+                "subdivisionMode",
+                String(optional=True),
+                prefix="--subdivision-mode",
+                doc="(-mode) How to divide intervals, one of: INTERVAL_SUBDIVISION, "
+                "BALANCING_WITHOUT_INTERVAL_SUBDIVISION, "
+                "BALANCING_WITHOUT_INTERVAL_SUBDIVISION_WITH_OVERFLOW",
+            ),
+        ]
+
+    def arguments(self):
+        return [
+            *super().arguments(),
+            ToolArgument(
+                "out",
+                prefix="--output",
+                doc="(-O) The directory into which to write the scattered interval files.",
+            ),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput(
+                "out",
+                Array(Bed),
+                glob=WildcardSelector("out/*.interval_list"),
+                doc="The scattered Picard style interval lists (these are prefixed "
+                "by shard number, so remain in genomic order). GATK recognises them by "
+                "their extension anywhere it accepts intervals.",
+            )
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            institution="Broad Institute",
+            keywords=["gatk", "gatk4", "broad", "intervals", "scatter"],
+            documentationUrl="https://gatk.broadinstitute.org/hc/en-us/articles/360036899632-SplitIntervals",
+            documentation="""\
+Split intervals into sub-interval files.
+
+Used to balance a list of intervals into a fixed number of evenly sized shards
+so a scatter has a predictable number of tasks.""",
+        )
+
+
+class Gatk4SplitIntervals_4_1_3(Gatk_4_1_3_0, Gatk4SplitIntervalsBase):
+    pass
+
+
+class Gatk4GatherPileupSummariesBase(Gatk4ToolBase, ABC):
+    @classmethod
+    def gatk_command(cls):
+        return "GatherPileupSummaries"
+
+    def tool(self):
+        return "Gatk4GatherPileupSummaries"
+
+    def friendly_name(self):
+        return "GATK4: GatherPileupSummaries"
+
+    def cpus(self, hints: Dict[str, Any]):
+        return 1
+
+    def memory(self, hints: Dict[str, Any]):
+        return 4
+
+    def inputs(self):
+        return [
+            *super().inputs(),
+            ToolInput(
+                "reference",
+                FastaWithDict,
+                position=2,
+                doc="Only the reference's sequence dictionary (.dict) is used, to order "
+                "the pileups",
+            ),
+            ToolInput(
+                "pileupTables",
+                Array(TextFile),
+                prefix="-I",
+                prefix_applies_to_all_elements=True,
+                position=4,
+                doc="The pileup tables (from GetPileupSummaries) of each shard",
+            ),
+            ToolInput(
+                "outputFilename",
+                Filename(suffix=".pileups", extension=".table"),
+                prefix="-O",
+                position=4,
+            ),
+        ]
+
+    def arguments(self):
+        return [
+            *super().arguments(),
+            # the .dict is a secondary file of the reference (replacing its extension)
+            ToolArgument("--sequence-dictionary `echo", position=1, shell_quote=False),
+            ToolArgument("| sed 's/\\.[^.]*$/.dict/'`", position=3, shell_quote=False),
+        ]
+
+    def outputs(self):
+        return [ToolOutput("out", TextFile, glob=InputSelector("outputFilename"))]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            institution="Broad Institute",
+            keywords=["gatk", "gatk4", "broad", "pileups", "contamination", "gather"],
+            documentationUrl="https://gatk.broadinstitute.org/hc/en-us/articles/360046788092-GatherPileupSummaries",
+            documentation="""\
+Combine the output files from parallelized GetPileupSummaries runs into one table, for
+CalculateContamination.""",
+        )
+
+
+class Gatk4GatherPileupSummaries_4_1_8(Gatk_4_1_8_1, Gatk4GatherPileupSummariesBase):
+    pass
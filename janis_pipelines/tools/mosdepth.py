@@ -0,0 +1,114 @@
+from datetime import date
+from typing import Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolArgument,
+    ToolMetadata,
+    String,
+    Int,
+    Boolean,
+    InputSelector,
+    CpuSelector,
+)
+from janis_bioinformatics.data_types import BamBai
+from janis_bioinformatics.tools import BioinformaticsTool
+from janis_unix.data_types import TextFile
+
+
+class Mosdepth_0_3_3(BioinformaticsTool):
+    def tool(self):
+        return "mosdepth"
+
+    def friendly_name(self):
+        return "mosdepth"
+
+    def tool_provider(self):
+        return "mosdepth"
+
+    def version(self):
+        return "0.3.3"
+
+    def container(self):
+        return "quay.io/biocontainers/mosdepth:0.3.3--hdfd78af_1"
+
+    def base_command(self):
+        return "mosdepth"
+
+    def cpus(self, hints: Dict[str, Any]):
+        # extra threads only help with BAM decompression
+        return 4
+
+    def memory(self, hints: Dict[str, Any]):
+        return 4
+
+    def arguments(self):
+        return [
+            ToolArgument(
+                CpuSelector(),
+                prefix="--threads",
+                doc="(-t) Number of BAM decompression threads",
+            )
+        ]
+
+    def inputs(self):
+        return [
+            ToolInput("outputPrefix", String, position=1, doc="Prefix for the outputs"),
+            ToolInput("bam", BamBai, position=2),
+            ToolInput(
+                "fastMode",
+                Boolean(optional=True),
+                default=True,
+                prefix="--fast-mode",
+                doc="(-x) Don't look at internal cigar operations or correct mate overlaps",
+            ),
+            ToolInput(
+                "noPerBase",
+                Boolean(optional=True),
+                default=True,
+                prefix="--no-per-base",
+                doc="(-n) Don't output per-base depth",
+            ),
+            ToolInput(
+                "flag",
+                Int(optional=True),
+                prefix="--flag",
+                doc="(-F) Exclude reads with any of the bits in FLAG set (default: 1796, "
+                "unmapped, secondary, QC failed and duplicate reads)",
+            ),
+            ToolInput(
+                "mappingQuality",
+                Int(optional=True),
+                prefix="--mapq",
+                doc="(-Q) Mapping quality threshold, reads with a quality less than this are "
+                "ignored",
+            ),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput(
+                "summary",
+                TextFile,
+                selector=InputSelector("outputPrefix") + ".mosdepth.summary.txt",
+                doc="Mean depth and bases covered for each contig, and the whole genome",
+            ),
+            ToolOutput(
+                "global_dist",
+                TextFile,
+                selector=InputSelector("outputPrefix") + ".mosdepth.global.dist.txt",
+                doc="The cumulative proportion of bases covered at each depth",
+            ),
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            keywords=["mosdepth", "coverage", "depth"],
+            documentationUrl="https://github.com/brentp/mosdepth",
+            documentation="""\
+Fast BAM/CRAM depth calculation. mosdepth reads the bam once (with multithreaded
+decompression) to report the coverage summary and distribution for the whole genome.""",
+        )
@@ -0,0 +1,426 @@
+from datetime import date
+from typing import List, Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolMetadata,
+    String,
+    Int,
+    Array,
+    File,
+    Filename,
+    InputSelector,
+    WorkflowBuilder,
+)
+from janis_bioinformatics.data_types import (
+    FastaWithDict,
+    BamBai,
+    VcfTabix,
+    Bed,
+    Vcf,
+    CompressedVcf,
+)
+from janis_bioinformatics.tools import BioinformaticsTool, BioinformaticsWorkflow
+from janis_bioinformatics.tools.common import SplitMultiAllele
+from janis_bioinformatics.tools.gatk4 import (
+    Gatk4LearnReadOrientationModelLatest,
+    Gatk4GetPileUpSummariesLatest,
+    Gatk4CalculateContaminationLatest,
+    Gatk4FilterMutectCallsLatest,
+)
+from janis_bioinformatics.tools.htslib import BGZipLatest, TabixLatest
+from janis_bioinformatics.tools.vcftools import VcfToolsvcftoolsLatest
+from janis_unix.data_types import Tsv, TarFileGz
+from janis_unix.tools import UncompressArchive
+
+from janis_pipelines.tools.bcftools import SliceVcfByIntervals_1_9
+from janis_pipelines.tools.gatk4 import (
+    Gatk4SplitIntervals_4_1_3,
+    Gatk4GatherPileupSummaries_4_1_8,
+)
+
+
+class ParabricksBqsr_4_0(BioinformaticsTool):
+    def tool(self):
+        return "ParabricksBqsr"
+
+    def friendly_name(self):
+        return "Parabricks: BQSR"
+
+    def tool_provider(self):
+        return "Parabricks"
+
+    def version(self):
+        return "4.0.1"
+
+    def container(self):
+        return "nvcr.io/nvidia/clara/clara-parabricks:4.0.1-1"
+
+    def base_command(self):
+        return ["pbrun", "bqsr"]
+
+    def cpus(self, hints: Dict[str, Any]):
+        return 16
+
+    def memory(self, hints: Dict[str, Any]):
+        return 64
+
+    def inputs(self) -> List[ToolInput]:
+        return [
+            ToolInput("reference", FastaWithDict, prefix="--ref"),
+            ToolInput("bam", BamBai, prefix="--in-bam"),
+            ToolInput(
+                "knownSites",
+                Array(VcfTabix),
+                prefix="--knownSites",
+                prefix_applies_to_all_elements=True,
+                doc="Known sites (eg: dbsnp, known indels), these are excluded when "
+                "modelling the errors",
+            ),
+            ToolInput(
+                "intervals",
+                Array(Bed, optional=True),
+                prefix="--interval-file",
+                prefix_applies_to_all_elements=True,
+                doc="Restrict the recalibration to these intervals",
+            ),
+            ToolInput(
+                "outputFilename",
+                Filename(
+                    prefix=InputSelector("bam", remove_file_extension=True),
+                    suffix=".recal",
+                    extension=".txt",
+                ),
+                prefix="--out-recal-file",
+            ),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput(
+                "out",
+                Tsv,
+                glob=InputSelector("outputFilename"),
+                doc="The GATK BQSR report, for mutectcaller to apply as it reads the bam",
+            )
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            documentationUrl="https://docs.nvidia.com/clara/parabricks/4.0.1/documentation/tooldocs/man_bqsr.html",
+            documentation="""\
+GPU accelerated GATK BaseRecalibrator, which calculates the recalibration table of the whole
+bam in one task. This tool requires an NVIDIA GPU, you'll need to configure your engine to
+schedule this tool onto a GPU enabled host.""",
+        )
+
+
+class ParabricksMutectCaller_4_0(BioinformaticsTool):
+    def tool(self):
+        return "ParabricksMutectCaller"
+
+    def friendly_name(self):
+        return "Parabricks: MutectCaller"
+
+    def tool_provider(self):
+        return "Parabricks"
+
+    def version(self):
+        return "4.0.1"
+
+    def container(self):
+        return "nvcr.io/nvidia/clara/clara-parabricks:4.0.1-1"
+
+    def base_command(self):
+        return ["pbrun", "mutectcaller"]
+
+    def cpus(self, hints: Dict[str, Any]):
+        return 16
+
+    def memory(self, hints: Dict[str, Any]):
+        return 64
+
+    def inputs(self) -> List[ToolInput]:
+        return [
+            ToolInput("reference", FastaWithDict, prefix="--ref"),
+            ToolInput("tumor_bam", BamBai, prefix="--in-tumor-bam"),
+            ToolInput("tumor_name", String, prefix="--tumor-name"),
+            ToolInput("normal_bam", BamBai, prefix="--in-normal-bam"),
+            ToolInput("normal_name", String, prefix="--normal-name"),
+            ToolInput(
+                "tumor_recal_table",
+                Tsv(optional=True),
+                prefix="--in-tumor-recal-file",
+                doc="BQSR report for the TUMOR bam, applied on the fly by mutectcaller",
+            ),
+            ToolInput(
+                "normal_recal_table",
+                Tsv(optional=True),
+                prefix="--in-normal-recal-file",
+                doc="BQSR report for the NORMAL bam, applied on the fly by mutectcaller",
+            ),
+            ToolInput(
+                "intervals",
+                Array(Bed, optional=True),
+                prefix="--interval-file",
+                prefix_applies_to_all_elements=True,
+                doc="Restrict calling to these intervals. Parabricks parallelises "
+                "across the GPU internally, so these are not scattered over.",
+            ),
+            ToolInput(
+                "gnomad",
+                VcfTabix(optional=True),
+                prefix="--mutect-germline-resource",
+            ),
+            ToolInput(
+                "num_gpus",
+                Int(optional=True),
+                default=1,
+                prefix="--num-gpus",
+                doc="Number of GPUs to use for the run",
+            ),
+            ToolInput(
+                "outputFilename",
+                Filename(prefix=InputSelector("tumor_name"), extension=".vcf"),
+                prefix="--out-vcf",
+            ),
+            ToolInput(
+                "f1r2OutputFilename",
+                Filename(
+                    prefix=InputSelector("tumor_name"),
+                    suffix=".f1r2",
+                    extension=".tar.gz",
+                ),
+                prefix="--mutect-f1r2-tar-gz",
+                doc="F1R2 counts, for LearnReadOrientationModel",
+            ),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput("out", Vcf, glob=InputSelector("outputFilename")),
+            ToolOutput(
+                "stats",
+                File,
+                glob=InputSelector("outputFilename") + ".stats",
+                doc="Mutect stats file, required by FilterMutectCalls",
+            ),
+            ToolOutput(
+                "f1r2",
+                TarFileGz,
+                glob=InputSelector("f1r2OutputFilename"),
+                doc="F1R2 counts, for LearnReadOrientationModel",
+            ),
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            documentationUrl="https://docs.nvidia.com/clara/parabricks/4.0.1/documentation/tooldocs/man_mutectcaller.html",
+            documentation="""\
+GPU accelerated GATK Mutect2. This tool requires an NVIDIA GPU, you'll need to
+configure your engine to schedule this tool onto a GPU enabled host.""",
+        )
+
+
+class ParabricksSomaticVariantCaller_4_0(BioinformaticsWorkflow):
+    def id(self):
+        return "ParabricksSomaticVariantCaller"
+
+    def friendly_name(self):
+        return "Parabricks Somatic Variant Caller"
+
+    def tool_provider(self):
+        return "Variant Callers"
+
+    def version(self):
+        return "4.0.1"
+
+    def constructor(self):
+
+        self.input("normal_bam", BamBai)
+        self.input("tumor_bam", BamBai)
+        self.input("normal_name", String)
+        self.input("tumor_name", String)
+        self.input("intervals", Array(Bed, optional=True))
+        self.input("reference", FastaWithDict)
+        self.input("snps_dbsnp", VcfTabix)
+        self.input("snps_1000gp", VcfTabix)
+        self.input("known_indels", VcfTabix)
+        self.input("mills_indels", VcfTabix)
+        self.input("gnomad", VcfTabix)
+        self.input("num_gpus", Int(optional=True))
+        self.input("scatter_count", Int, default=64)
+
+        # mutectcaller applies the recalibration as it reads the bams,
+        # so we only need to calculate the tables here. These are calculated on the
+        # GPU too, a whole genome BaseRecalibrator JVM would take longer than the calling.
+        known_sites = [
+            self.snps_dbsnp,
+            self.snps_1000gp,
+            self.known_indels,
+            self.mills_indels,
+        ]
+        self.step(
+            "recal_table_normal",
+            ParabricksBqsr_4_0(
+                bam=self.normal_bam,
+                reference=self.reference,
+                knownSites=known_sites,
+                intervals=self.intervals,
+            ),
+        )
+        self.step(
+            "recal_table_tumor",
+            ParabricksBqsr_4_0(
+                bam=self.tumor_bam,
+                reference=self.reference,
+                knownSites=known_sites,
+                intervals=self.intervals,
+            ),
+        )
+
+        self.step(
+            "mutectcaller",
+            ParabricksMutectCaller_4_0(
+                normal_bam=self.normal_bam,
+                tumor_bam=self.tumor_bam,
+                normal_name=self.normal_name,
+                tumor_name=self.tumor_name,
+                normal_recal_table=self.recal_table_normal.out,
+                tumor_recal_table=self.recal_table_tumor.out,
+                intervals=self.intervals,
+                reference=self.reference,
+                gnomad=self.gnomad,
+                num_gpus=self.num_gpus,
+            ),
+        )
+        self.step("compressvcf", BGZipLatest(file=self.mutectcaller.out))
+        self.step("indexvcf", TabixLatest(inp=self.compressvcf.out))
+
+        self.step(
+            "learnorientationmodel",
+            Gatk4LearnReadOrientationModelLatest(
+                f1r2CountsFiles=[self.mutectcaller.f1r2]
+            ),
+        )
+
+        # GetPileupSummaries would be a whole genome JVM too, so scatter it across the
+        # intervals (each with its own slice of gnomad) and gather the tables
+        self.step(
+            "split_intervals",
+            Gatk4SplitIntervals_4_1_3(
+                reference=self.reference,
+                intervals=self.intervals,
+                scatterCount=self.scatter_count,
+                subdivisionMode="BALANCING_WITHOUT_INTERVAL_SUBDIVISION_WITH_OVERFLOW",
+            ),
+        )
+        self.step(
+            "slice_gnomad",
+            SliceVcfByIntervals_1_9(
+                intervals=self.split_intervals.out, vcf=self.gnomad
+            ),
+        )
+        self.step(
+            "getpileupsummaries",
+            ParabricksSomaticVariantCaller_4_0.pileups_subpipeline(
+                tumor_bam=self.tumor_bam,
+                intervals=self.split_intervals.out,
+                gnomad=self.slice_gnomad.out,
+            ),
+            scatter=["intervals", "gnomad"],
+        )
+        self.step(
+            "gatherpileupsummaries",
+            Gatk4GatherPileupSummaries_4_1_8(
+                reference=self.reference, pileupTables=self.getpileupsummaries.out
+            ),
+        )
+        self.step(
+            "calculatecontamination",
+            Gatk4CalculateContaminationLatest(
+                pileupTable=self.gatherpileupsummaries.out
+            ),
+        )
+
+        # match the filtering of the GATK4 SomaticVariantCaller
+        self.step(
+            "filtermutect2calls",
+            Gatk4FilterMutectCallsLatest(
+                vcf=self.indexvcf.out.as_type(VcfTabix),
+                reference=self.reference,
+                segmentationFile=self.calculatecontamination.segOut,
+                contaminationTable=self.calculatecontamination.contOut,
+                readOrientationModel=self.learnorientationmodel.out,
+                statsFile=self.mutectcaller.stats,
+            ),
+        )
+        self.step("uncompressvcf", UncompressArchive(file=self.filtermutect2calls.out))
+        self.step(
+            "splitnormalisevcf",
+            SplitMultiAllele(
+                vcf=self.uncompressvcf.out.as_type(Vcf), reference=self.reference
+            ),
+        )
+        self.step(
+            "filterpass",
+            VcfToolsvcftoolsLatest(
+                vcf=self.splitnormalisevcf.out,
+                removeFileteredAll=True,
+                recode=True,
+                recodeINFOAll=True,
+            ),
+        )
+
+        self.output("variants", source=self.filtermutect2calls.out)
+        self.output("out", source=self.filterpass.out)
+
+    @staticmethod
+    def pileups_subpipeline(**connections):
+        w = WorkflowBuilder("pileups_subpipeline")
+
+        w.input("tumor_bam", BamBai)
+        w.input("intervals", Bed)
+        w.input("gnomad", CompressedVcf)
+
+        # gnomad is the (small) slice of this shard, so it's cheap to index here
+        w.step("index_gnomad", TabixLatest(inp=w.gnomad))
+        w.step(
+            "getpileupsummaries",
+            Gatk4GetPileUpSummariesLatest(
+                bam=[w.tumor_bam],
+                sites=w.index_gnomad.out.as_type(VcfTabix),
+                intervals=w.intervals,
+            ),
+        )
+
+        w.output("out", source=w.getpileupsummaries.out)
+
+        return w(**connections)
+
+    def bind_metadata(self):
+        self.metadata.dateCreated = date(2021, 6, 1)
+        self.metadata.dateUpdated = date(2021, 6, 1)
+        self.metadata.keywords = [
+            "variants",
+            "parabricks",
+            "gpu",
+            "variant caller",
+            "somatic",
+            "paired",
+        ]
+        self.metadata.documentation = """\
+GPU accelerated equivalent of the GATK4 SomaticVariantCaller. Base recalibration tables are
+calculated (on the GPU) for both bams, then Mutect2 is run through Parabricks' mutectcaller (across all of
+the intervals in one task). As in the CPU variant caller, the calls are filtered with the read
+orientation model and the contamination (from the tumor's pileups, scattered across the
+intervals), then split and normalised.
+
+A panel of normals isn't supported: mutectcaller needs the '.pon' file that 'pbrun prepon'
+writes alongside the VCF, and its annotations are only applied by a separate 'pbrun postpon'.
+"""
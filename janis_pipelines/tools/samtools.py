@@ -0,0 +1,74 @@
+from datetime import date
+from typing import Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolArgument,
+    ToolMetadata,
+    Stdout,
+    CpuSelector,
+)
+from janis_bioinformatics.data_types import BamBai
+from janis_bioinformatics.tools import BioinformaticsTool
+from janis_unix.data_types import TextFile
+
+
+class SamToolsStats_1_9(BioinformaticsTool):
+    def tool(self):
+        return "SamToolsStats"
+
+    def friendly_name(self):
+        return "SamTools: Stats"
+
+    def tool_provider(self):
+        return "Samtools"
+
+    def version(self):
+        return "1.9.0"
+
+    def container(self):
+        return "quay.io/biocontainers/samtools:1.9--h8571acd_11"
+
+    def base_command(self):
+        return ["samtools", "stats"]
+
+    def cpus(self, hints: Dict[str, Any]):
+        # extra threads only help with BAM decompression
+        return 4
+
+    def memory(self, hints: Dict[str, Any]):
+        return 4
+
+    def arguments(self):
+        return [
+            ToolArgument(
+                CpuSelector(),
+                prefix="--threads",
+                doc="(-@) Number of additional BAM decompression threads",
+            )
+        ]
+
+    def inputs(self):
+        return [ToolInput("bam", BamBai, position=1)]
+
+    def outputs(self):
+        return [
+            ToolOutput(
+                "out",
+                Stdout(TextFile),
+                doc="The stats report, its summary numbers (SN) section has the mapped, "
+                "duplicated and properly paired reads, and the insert size",
+            )
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            keywords=["samtools", "stats", "qc"],
+            documentationUrl="http://www.htslib.org/doc/samtools-stats.html",
+            documentation="""\
+Collect statistics from a BAM in a single pass, including the mapping rate, the
+duplicate rate (from the reads flagged by markdup) and the insert size distribution.""",
+        )
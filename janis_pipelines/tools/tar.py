@@ -0,0 +1,108 @@
+from datetime import date
+from typing import Dict, Any
+
+from janis_core import (
+    ToolInput,
+    ToolOutput,
+    ToolArgument,
+    ToolMetadata,
+    Array,
+    File,
+    Filename,
+    InputSelector,
+)
+from janis_bioinformatics.tools import BioinformaticsTool
+from janis_unix.data_types import TarFile, TextFile
+
+
+class TarShards_1_30(BioinformaticsTool):
+    def tool(self):
+        return "TarShards"
+
+    def friendly_name(self):
+        return "Tar: Archive shards"
+
+    def tool_provider(self):
+        return "GNU"
+
+    def version(self):
+        return "1.30"
+
+    def container(self):
+        return "ubuntu:20.04"
+
+    def base_command(self):
+        return None
+
+    def cpus(self, hints: Dict[str, Any]):
+        return 1
+
+    def memory(self, hints: Dict[str, Any]):
+        return 1
+
+    def arguments(self):
+        return [
+            # every shard has the same filename, so link each one into the archive's
+            # directory prefixed with its (zero-padded) position in the scatter. Backticks
+            # rather than $(...), which CWL would treat as a parameter reference.
+            ToolArgument(
+                "; mkdir shards && i=0 && for f in", position=1, shell_quote=False
+            ),
+            ToolArgument(
+                '; do i=`expr $i + 1`; n=`printf %05d $i`; b=`basename "$f"`;'
+                ' ln -s "$f" "shards/$n-$b"; done'
+                ' && tar -chf "$OUT" shards && tar -tRf "$OUT" >',
+                position=3,
+                shell_quote=False,
+            ),
+        ]
+
+    def inputs(self):
+        return [
+            ToolInput(
+                "files",
+                Array(File),
+                position=2,
+                shell_quote=False,
+                doc="The shards to archive, in scatter order",
+            ),
+            ToolInput(
+                "outputFilename",
+                Filename(suffix=".shards", extension=".tar"),
+                prefix="OUT=",
+                separate_value_from_prefix=False,
+                position=0,
+                shell_quote=False,
+                doc="Filename of the (uncompressed) tar archive, it's referenced as $OUT in the command",
+            ),
+            ToolInput(
+                "indexFilename",
+                Filename(suffix=".shards", extension=".index.txt"),
+                position=4,
+                doc="Filename of the archive's index",
+            ),
+        ]
+
+    def outputs(self):
+        return [
+            ToolOutput("out", TarFile, glob=InputSelector("outputFilename")),
+            ToolOutput(
+                "out_index",
+                TextFile,
+                glob=InputSelector("indexFilename"),
+                doc="The block offset of each shard in the archive (tar -tR), so a "
+                "single shard can be read without scanning the whole archive",
+            ),
+        ]
+
+    def bind_metadata(self):
+        return ToolMetadata(
+            dateCreated=date(2021, 6, 1),
+            dateUpdated=date(2021, 6, 1),
+            keywords=["tar", "archive", "shards"],
+            documentationUrl="https://www.gnu.org/software/tar/manual/tar.html",
+            documentation="""\
+Bundle the per-interval shards of a scattered step into a single tar archive, so they're
+published as one file rather than one (small) file per interval. The shards are already
+small text or compressed files, so the archive itself isn't compressed.""",
+        )
@@ -1,5 +1,9 @@
-from janis_bioinformatics.data_types import FastqGzPair
+from typing import Optional, List
+
+from janis_bioinformatics.data_types import FastqGzPair, CompressedVcf, Vcf
 from janis_core import String, Array, InputDocumentation, InputQualityType
+from janis_core.tool.test_classes import TTestCase
+from janis_unix.data_types import TarFile, TextFile
 
 from janis_pipelines.wgs_somatic.wgssomatic_variantsonly import (
     WGSSomaticMultiCallersVariantsOnly,
@@ -84,6 +88,35 @@ class WGSSomaticMultiCallers(WGSSomaticMultiCallersVariantsOnly, WGSSomaticGATK)
         self.add_inputs_for_intervals()
         self.add_inputs_for_configuration()
 
+    def tests(self) -> Optional[List[TTestCase]]:
+        return [
+            TTestCase(
+                name="basic",
+                input=self.basic_test_inputs(),
+                output=self.preprocessing_test_outputs()
+                + CompressedVcf.basic_test(
+                    "out_variants_gatk",
+                    9040,
+                    147,
+                    ["GATKCommandLine"],
+                    "a2e4f96c451754ef8cba80494ed98a70",
+                )
+                + Vcf.basic_test(
+                    "out_variants",
+                    44090,
+                    156,
+                    ["GATKCommandLine"],
+                    "5fc0e861893e0a23f974808265a6917e",
+                )
+                # tar pads the archive to (at least) one 10240 byte record, and the index
+                # lists the shards by their position in the scatter
+                + TarFile.basic_test("out_variants_split", 10240)
+                + TextFile.basic_test(
+                    "out_variants_split_index", 20, min_required_content="shards/00001-"
+                ),
+            )
+        ]
+
 
 if __name__ == "__main__":
     import os.path
@@ -1,8 +1,6 @@
 from datetime import date
 
-from janis_bioinformatics.data_types import Bed, BedTabix, Vcf, CompressedVcf
-from janis_bioinformatics.tools.bcftools import BcfToolsSort_1_9
-from janis_bioinformatics.tools.common import GATKBaseRecalBQSRWorkflow_4_1_3
+from janis_bioinformatics.data_types import Bed, BedTabix, CompressedVcf
 from janis_bioinformatics.tools.gatk4 import Gatk4GatherVcfs_4_1_3
 from janis_bioinformatics.tools.htslib import BGZipLatest
 from janis_bioinformatics.tools.papenfuss import Gridss_2_6_2
@@ -10,10 +8,8 @@ from janis_bioinformatics.tools.pmac import (
     CombineVariants_0_0_8,
     GenerateVardictHeaderLines,
     AddBamStatsSomatic_0_1_0,
-    GenerateIntervalsByChromosome,
     GenerateMantaConfig,
 )
-from janis_bioinformatics.tools.variantcallers import GatkSomaticVariantCaller_4_1_3
 from janis_bioinformatics.tools.variantcallers.illuminasomatic_strelka import (
     IlluminaSomaticVariantCaller,
 )
@@ -32,9 +28,8 @@ from janis_core import (
     InputQualityType,
     StringFormatter,
 )
-from janis_core.operators.standard import FirstOperator
-from janis_unix.tools import UncompressArchive
 
+from janis_pipelines.tools import SortAndCompressVcf_1_9
 from janis_pipelines.wgs_somatic_gatk.wgssomaticgatk_variantsonly import (
     WGSSomaticGATKVariantsOnly,
     INPUT_DOCS,
@@ -265,66 +260,10 @@ class WGSSomaticMultiCallersVariantsOnly(WGSSomaticGATKVariantsOnly):
 
     def add_gatk_variantcaller(self, normal_bam_source, tumor_bam_source):
         """
-        Reimplemented because need steps for combine
+        Reimplemented because need outputs for combine
         """
-
-        if "generate_gatk_intervals" in self.step_nodes:
-            generated_intervals = self.generate_gatk_intervals.out_regions
-        else:
-            generated_intervals = self.step(
-                "generate_gatk_intervals",
-                GenerateIntervalsByChromosome(reference=self.reference),
-                when=self.gatk_intervals.is_null(),
-            ).out_regions
-
-        intervals = FirstOperator([self.gatk_intervals, generated_intervals])
-
-        recal_ins = {
-            "reference": self.reference,
-            "intervals": intervals,
-            "snps_dbsnp": self.snps_dbsnp,
-            "snps_1000gp": self.snps_1000gp,
-            "known_indels": self.known_indels,
-            "mills_indels": self.mills_indels,
-        }
-
-        self.step(
-            "bqsr_normal",
-            GATKBaseRecalBQSRWorkflow_4_1_3(bam=normal_bam_source, **recal_ins),
-            scatter="intervals",
-        )
-
-        self.step(
-            "bqsr_tumor",
-            GATKBaseRecalBQSRWorkflow_4_1_3(bam=tumor_bam_source, **recal_ins),
-            scatter="intervals",
-        )
-
-        self.step(
-            "vc_gatk",
-            GatkSomaticVariantCaller_4_1_3(
-                normal_bam=self.bqsr_normal.out,
-                tumor_bam=self.bqsr_tumor.out,
-                normal_name=self.normal_name,
-                intervals=intervals,
-                reference=self.reference,
-                gnomad=self.gnomad,
-                panel_of_normals=self.panel_of_normals,
-            ),
-            scatter=["intervals", "normal_bam", "tumor_bam"],
-        )
-
-        self.step("vc_gatk_merge", Gatk4GatherVcfs_4_1_3(vcfs=self.vc_gatk.out))
-        self.step("vc_gatk_compress_for_sort", BGZipLatest(file=self.vc_gatk_merge.out))
-        self.step(
-            "vc_gatk_sort_combined",
-            BcfToolsSort_1_9(
-                vcf=self.vc_gatk_compress_for_sort.out.as_type(CompressedVcf)
-            ),
-        )
-        self.step(
-            "vc_gatk_uncompressvcf",
-            UncompressArchive(file=self.vc_gatk_sort_combined.out),
+        super().add_gatk_variantcaller(
+            normal_bam_source=normal_bam_source, tumor_bam_source=tumor_bam_source
         )
 
         # VCF
@@ -343,12 +282,21 @@ class WGSSomaticMultiCallersVariantsOnly(WGSSomaticGATKVariantsOnly):
         )
         self.output(
             "out_variants_split",
-            source=self.vc_gatk.out,
+            source=self.vc_gatk.out_split,
             output_folder=[
                 "vcf",
                 "GATKByInterval",
             ],
-            doc="Unmerged variants from the GATK caller (by interval)",
+            doc="Unmerged variants from the GATK caller (by interval), as a tar archive",
+        )
+        self.output(
+            "out_variants_split_index",
+            source=self.vc_gatk.out_split_index,
+            output_folder=[
+                "vcf",
+                "GATKByInterval",
+            ],
+            doc="The offset of each interval's variants in the archive",
         )
 
     def add_strelka_variantcaller(self, normal_bam_source, tumor_bam_source):
@@ -402,19 +350,13 @@ class WGSSomaticMultiCallersVariantsOnly(WGSSomaticGATKVariantsOnly):
             scatter="intervals",
         )
         self.step("vc_vardict_merge", Gatk4GatherVcfs_4_1_3(vcfs=self.vc_vardict.out))
-        self.step(
-            "vc_vardict_compress_for_sort", BGZipLatest(file=self.vc_vardict_merge.out)
-        )
         self.step(
             "vc_vardict_sort_combined",
-            BcfToolsSort_1_9(
-                vcf=self.vc_vardict_compress_for_sort.out.as_type(CompressedVcf)
+            SortAndCompressVcf_1_9(
+                vcf=self.vc_vardict_merge.out,
+                compressionLevel=self.final_compression_level,
             ),
         )
-        self.step(
-            "vc_vardict_uncompress_for_combine",
-            UncompressArchive(file=self.vc_vardict_sort_combined.out),
-        )
 
         self.output(
             "out_variants_vardict",
@@ -446,21 +388,22 @@ class WGSSomaticMultiCallersVariantsOnly(WGSSomaticGATKVariantsOnly):
                 normal=self.normal_name,
                 tumor=self.tumor_name,
                 vcfs=[
-                    self.vc_gatk_uncompressvcf.out.as_type(Vcf),
+                    self.vc_gatk_sort_combined.out_uncompressed,
                     self.vc_strelka.out,
-                    self.vc_vardict_uncompress_for_combine.out.as_type(Vcf),
+                    self.vc_vardict_sort_combined.out_uncompressed,
                 ],
                 type="somatic",
                 columns=["AD", "DP", "GT"],
             ),
         )
 
-        self.step("combined_compress", BGZipLatest(file=self.combine_variants.out))
+        # AddBamStats needs an uncompressed VCF, which the sort emits alongside the
+        # bgzipped one, rather than us compressing, sorting and uncompressing it again.
+        # The bgzipped VCF isn't published, so it's only compressed at level 1.
         self.step(
             "combined_sort",
-            BcfToolsSort_1_9(vcf=self.combined_compress.out.as_type(CompressedVcf)),
+            SortAndCompressVcf_1_9(vcf=self.combine_variants.out, compressionLevel=1),
         )
-        self.step("combined_uncompress", UncompressArchive(file=self.combined_sort.out))
 
         self.step(
             "combined_addbamstats",
@@ -469,7 +412,7 @@ class WGSSomaticMultiCallersVariantsOnly(WGSSomaticGATKVariantsOnly):
                 tumor_id=self.tumor_name,
                 normal_bam=normal_bam_source,
                 tumor_bam=tumor_bam_source,
-                vcf=self.combined_uncompress.out.as_type(Vcf),
+                vcf=self.combined_sort.out_uncompressed,
                 reference=self.reference,
             ),
         )
@@ -1,3 +1,4 @@
+import operator
 from datetime import date
 from typing import Optional, List
 
@@ -6,27 +7,18 @@ from janis_bioinformatics.data_types import (
     VcfTabix,
     Bed,
     FastqGzPair,
-    File,
     BamBai,
     CompressedVcf,
     Vcf,
 )
-from janis_bioinformatics.tools.babrahambioinformatics import FastQC_0_11_8
 from janis_bioinformatics.tools.bcftools import BcfToolsSort_1_9
 from janis_bioinformatics.tools.bioinformaticstoolbase import BioinformaticsWorkflow
-from janis_bioinformatics.tools.common import (
-    BwaAligner,
-    MergeAndMarkBams_4_1_3,
-    GATKBaseRecalBQSRWorkflow_4_1_3,
-)
+from janis_bioinformatics.tools.common import GATKBaseRecalBQSRWorkflow_4_1_3
 from janis_bioinformatics.tools.gatk4 import Gatk4GatherVcfs_4_1_3
 from janis_bioinformatics.tools.htslib import BGZipLatest
 from janis_bioinformatics.tools.papenfuss import Gridss_2_6_2
 from janis_bioinformatics.tools.pmac import (
-    ParseFastqcAdaptors,
-    PerformanceSummaryGenome_0_1_0,
     AddBamStatsSomatic_0_1_0,
-    GenerateGenomeFileForBedtoolsCoverage,
     GenerateIntervalsByChromosome,
 )
 from janis_bioinformatics.tools.variantcallers import GatkSomaticVariantCaller_4_1_3
@@ -39,10 +31,20 @@ from janis_core import (
     InputQualityType,
 )
 from janis_core.operators.standard import FirstOperator
-from janis_core.tool.test_classes import TTestCase
+from janis_core.tool.test_classes import (
+    TTestCase,
+    TTestExpectedOutput,
+    TTestPreprocessor,
+)
+from janis_unix.data_types import TarFile, TextFile
 from janis_unix.tools import UncompressArchive
-from janis_unix.data_types import TextFile
 
+from janis_pipelines.tools import (
+    BwaAlignAndMarkDuplicates_0_7_17,
+    Fastp_0_23_2,
+    Mosdepth_0_3_3,
+    SamToolsStats_1_9,
+)
 from janis_pipelines.wgs_somatic_gatk.wgssomaticgatk_variantsonly import (
     WGSSomaticGATKVariantsOnly,
     INPUT_DOCS,
@@ -63,6 +65,9 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
         self.add_gatk_variantcaller(
             normal_bam_source=self.normal.out_bam, tumor_bam_source=self.tumor.out_bam
         )
+        self.add_addbamstats(
+            normal_bam_source=self.normal.out_bam, tumor_bam_source=self.tumor.out_bam
+        )
 
     def add_inputs(self):
         # INPUTS
@@ -75,10 +80,6 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
         self.add_inputs_for_intervals()
         self.add_inputs_for_configuration()
 
-    def add_inputs_for_configuration(self):
-        super().add_inputs_for_configuration()
-        self.input("cutadapt_adapters", File, doc=INPUT_DOCS["cutadapt_adapters"])
-
     def add_preprocessing_steps(self):
         intervals = FirstOperator(
             [
@@ -93,7 +94,6 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
 
         sub_inputs = {
             "reference": self.reference,
-            "cutadapt_adapters": self.cutadapt_adapters,
             "gatk_intervals": intervals,
             "snps_dbsnp": self.snps_dbsnp,
             "snps_1000gp": self.snps_1000gp,
@@ -102,6 +102,9 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
         }
 
         # STEPS
+        # The tumor and normal subpipelines share no outputs, so the engine is free to
+        # schedule them concurrently. Each tool declares its own cpus and memory, so they
+        # don't need any further hints to be placed onto separate nodes.
         self.step(
             "tumor",
             self.process_subpipeline(
@@ -115,43 +118,70 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
             ),
         )
 
-        # FASTQC
+        # FASTP
+        self.output(
+            "out_normal_fastp_reports",
+            source=self.normal.out_fastp_reports,
+            output_folder="reports",
+        )
+        self.output(
+            "out_tumor_fastp_reports",
+            source=self.tumor.out_fastp_reports,
+            output_folder="reports",
+        )
         self.output(
-            "out_normal_fastqc_reports",
-            source=self.normal.out_fastqc_reports,
+            "out_normal_fastp_json",
+            source=self.normal.out_fastp_json,
             output_folder="reports",
+            doc="The fastp JSON report of each NORMAL read pair, for MultiQC",
         )
         self.output(
-            "out_tumor_fastqc_reports",
-            source=self.tumor.out_fastqc_reports,
+            "out_tumor_fastp_json",
+            source=self.tumor.out_fastp_json,
             output_folder="reports",
+            doc="The fastp JSON report of each TUMOR read pair, for MultiQC",
         )
 
         # COVERAGE
-        # self.output(
-        #     "out_normal_coverage",
-        #     source=self.normal.depth_of_coverage,
-        #     output_folder=["summary", self.normal_name],
-        #     doc="A text file of depth of coverage summary of NORMAL bam",
-        # )
-        # self.output(
-        #     "out_tumor_coverage",
-        #     source=self.tumor.depth_of_coverage,
-        #     output_folder=["summary", self.tumor_name],
-        #     doc="A text file of depth of coverage summary of TUMOR bam",
-        # )
+        self.output(
+            "out_normal_coverage",
+            source=self.normal.out_coverage_summary,
+            output_folder=["summary", self.normal_name],
+            doc="A text file of depth of coverage summary of NORMAL bam",
+        )
+        self.output(
+            "out_tumor_coverage",
+            source=self.tumor.out_coverage_summary,
+            output_folder=["summary", self.tumor_name],
+            doc="A text file of depth of coverage summary of TUMOR bam",
+        )
+        self.output(
+            "out_normal_coverage_distribution",
+            source=self.normal.out_coverage_distribution,
+            output_folder=["summary", self.normal_name],
+            doc="The cumulative distribution of depth of coverage of NORMAL bam",
+        )
+        self.output(
+            "out_tumor_coverage_distribution",
+            source=self.tumor.out_coverage_distribution,
+            output_folder=["summary", self.tumor_name],
+            doc="The cumulative distribution of depth of coverage of TUMOR bam",
+        )
+
         # BAM PERFORMANCE
         self.output(
             "out_normal_performance_summary",
             source=self.normal.out_performance_summary,
             output_folder=["summary", self.normal_name],
-            doc="A text file of performance summary of NORMAL bam",
+            doc="The samtools stats report (mapping rate, duplicates and insert size) of "
+            "NORMAL bam",
         )
         self.output(
             "out_tumor_performance_summary",
             source=self.tumor.out_performance_summary,
             output_folder=["summary", self.tumor_name],
-            doc="A text file of performance summary of TUMOR bam",
+            doc="The samtools stats report (mapping rate, duplicates and insert size) of "
+            "TUMOR bam",
         )
 
         self.output(
@@ -176,7 +206,6 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
         w.input("reads", Array(FastqGzPair))
         w.input("sample_name", String)
         w.input("reference", FastaWithDict)
-        w.input("cutadapt_adapters", File(optional=True))
         w.input("gatk_intervals", Array(Bed))
         w.input("snps_dbsnp", VcfTabix)
         w.input("snps_1000gp", VcfTabix)
@@ -184,120 +213,130 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
         w.input("mills_indels", VcfTabix)
 
         # STEPS
-        w.step("fastqc", FastQC_0_11_8(reads=w.reads), scatter="reads")
-
+        # fastp detects the adapters itself, and trims them (and low quality tails)
+        # in the same pass that produces the QC reports (named after each pair's R1 fastq,
+        # so they don't collide). It's scattered per pair so when top-ups are added and
+        # the sample is re-run, call caching only runs the new pairs.
         w.step(
-            "getfastqc_adapters",
-            ParseFastqcAdaptors(
-                fastqc_datafiles=w.fastqc.datafile,
-                cutadapt_adaptors_lookup=w.cutadapt_adapters,
+            "fastp",
+            Fastp_0_23_2(
+                reads=w.reads,
+                cutTail=True,
+                cutMeanQuality=15,
+                lengthRequired=50,
+                compression=1,
             ),
-            scatter="fastqc_datafiles",
+            scatter="reads",
         )
 
+        # All of the trimmed pairs are aligned in one call, and the alignments are
+        # streamed through sort and markdup, so the only bam written is the final one.
+        # An engine with call caching enabled will reuse this bam when the same reads
+        # are used between runs (eg: a normal used against several tumors).
         w.step(
-            "align_and_sort",
-            BwaAligner(
-                fastq=w.reads,
-                reference=w.reference,
-                sample_name=w.sample_name,
-                sortsam_tmpDir=None,
-                cutadapt_adapter=w.getfastqc_adapters,
-                cutadapt_removeMiddle3Adapter=w.getfastqc_adapters,
+            "align_dedup",
+            BwaAlignAndMarkDuplicates_0_7_17(
+                reads=w.fastp.out, reference=w.reference, sampleName=w.sample_name
             ),
-            scatter=["fastq", "cutadapt_adapter", "cutadapt_removeMiddle3Adapter"],
         )
 
-        w.step(
-            "merge_and_mark",
-            MergeAndMarkBams_4_1_3(bams=w.align_and_sort.out, sampleName=w.sample_name),
-        )
-
-        # Temporarily remove GATK4 DepthOfCoverage for performance reasons, see:
+        # mosdepth reports the coverage from a single (multithreaded) read of the bam,
+        # rather than the five passes (and filtered bam) of PerformanceSummaryGenome,
+        # or the slowness of GATK4 DepthOfCoverage, see:
         #   https://gatk.broadinstitute.org/hc/en-us/community/posts/360071895391-Speeding-up-GATK4-DepthOfCoverage
-
-        # w.step(
-        #     "coverage",
-        #     Gatk4DepthOfCoverage_4_1_6(
-        #         bam=w.merge_and_mark.out,
-        #         reference=w.reference,
-        #         intervals=w.gatk_intervals,
-        #         omitDepthOutputAtEachBase=True,
-        #         # countType="COUNT_FRAGMENTS_REQUIRE_SAME_BASE",
-        #         summaryCoverageThreshold=[1, 50, 100, 300, 500],
-        #         outputPrefix=w.sample_name,
-        #     ),
-        # )
-
         w.step(
-            "calculate_performancesummary_genomefile",
-            GenerateGenomeFileForBedtoolsCoverage(reference=w.reference),
-        )
-
-        w.step(
-            "performance_summary",
-            PerformanceSummaryGenome_0_1_0(
-                bam=w.merge_and_mark.out,
-                sample_name=w.sample_name,
-                genome_file=w.calculate_performancesummary_genomefile.out,
-            ),
+            "coverage",
+            Mosdepth_0_3_3(bam=w.align_dedup.out, outputPrefix=w.sample_name),
         )
+        # and the mapping, duplicate and insert size metrics that PerformanceSummaryGenome
+        # also reported come from (another single pass of) samtools stats
+        w.step("performance_summary", SamToolsStats_1_9(bam=w.align_dedup.out))
 
         # OUTPUTS
-        w.output("out_bam", source=w.merge_and_mark.out)
-        w.output("out_fastqc_reports", source=w.fastqc.out)
-        # w.output("depth_of_coverage", source=w.coverage.out_sampleSummary)
-        w.output(
-            "out_performance_summary",
-            source=w.performance_summary.performanceSummaryOut,
-        )
+        w.output("out_bam", source=w.align_dedup.out)
+        w.output("out_fastp_reports", source=w.fastp.out_html)
+        w.output("out_fastp_json", source=w.fastp.out_json)
+        w.output("out_coverage_summary", source=w.coverage.summary)
+        w.output("out_coverage_distribution", source=w.coverage.global_dist)
+        w.output("out_performance_summary", source=w.performance_summary.out)
 
         return w(**connections)
 
-    def tests(self) -> Optional[List[TTestCase]]:
+    @staticmethod
+    def basic_test_inputs():
         bioinf_base = "https://swift.rc.nectar.org.au/v1/AUTH_4df6e734a509497692be237549bbe9af/janis-test-data/bioinformatics"
         chr17 = f"{bioinf_base}/petermac_testdata"
 
+        return {
+            "normal_inputs": [
+                [
+                    f"{chr17}/NA24385-BRCA1_R1.fastq.gz",
+                    f"{chr17}/NA24385-BRCA1_R21.fastq.gz",
+                ]
+            ],
+            "normal_name": "NA24385-BRCA1",
+            "tumor_inputs": [
+                [
+                    f"{chr17}/NA12878-NA24385-mixture-BRCA1_R1.fastq.gz",
+                    f"{chr17}/NA12878-NA24385-mixture-BRCA1_R2.fastq.gz",
+                ]
+            ],
+            "tumor_name": "NA12878-NA24385-mixture",
+            "reference": f"{chr17}/Homo_sapiens_assembly38.chr17.fasta",
+            "gridss_blacklist": f"{chr17}/consensusBlacklist.hg38.chr17.bed",
+            "gnomad": f"{chr17}/af-only-gnomad.hg38.BRCA1.vcf.gz",
+            "gatk_intervals": [f"{chr17}/BRCA1.hg38.bed"],
+            "known_indels": f"{chr17}/Homo_sapiens_assembly38.known_indels.BRCA1.vcf.gz",
+            "mills_indels": f"{chr17}/Mills_and_1000G_gold_standard.indels.hg38.BRCA1.vcf.gz",
+            "snps_1000gp": f"{chr17}/1000G_phase1.snps.high_confidence.hg38.BRCA1.vcf.gz",
+            "snps_dbsnp": f"{chr17}/Homo_sapiens_assembly38.dbsnp138.BRCA1.vcf.gz",
+        }
+
+    @staticmethod
+    def preprocessing_test_outputs():
+        def contains(tag, value):
+            return [
+                TTestExpectedOutput(
+                    tag=tag,
+                    preprocessor=TTestPreprocessor.FileContent,
+                    operator=operator.contains,
+                    expected_value=value,
+                )
+            ]
+
+        outputs = []
+        for sample in ["normal", "tumor"]:
+            # one report for the (single) read pair of each sample. mosdepth's summary
+            # has a header, and in its cumulative distribution all of the bases are
+            # covered to a depth of 0. The samtools stats summary numbers (SN) have the
+            # duplicates and insert size
+            outputs += (
+                Array.array_wrapper(
+                    [contains(f"out_{sample}_fastp_reports", "fastp report")]
+                )
+                + Array.array_wrapper(
+                    [contains(f"out_{sample}_fastp_json", '"after_filtering"')]
+                )
+                + contains(f"out_{sample}_coverage", "chrom\tlength\tbases\tmean")
+                + contains(f"out_{sample}_coverage_distribution", "total\t0\t1.00")
+                + contains(f"out_{sample}_performance_summary", "SN\treads duplicated:")
+                + contains(
+                    f"out_{sample}_performance_summary", "SN\tinsert size average:"
+                )
+            )
+
+        return (
+            BamBai.basic_test("out_normal_bam", 3265300, 49500)
+            + BamBai.basic_test("out_tumor_bam", 3341700, 49000)
+            + outputs
+        )
+
+    def tests(self) -> Optional[List[TTestCase]]:
         return [
             TTestCase(
                 name="basic",
-                input={
-                    "normal_inputs": [
-                        [
-                            f"{chr17}/NA24385-BRCA1_R1.fastq.gz",
-                            f"{chr17}/NA24385-BRCA1_R21.fastq.gz",
-                        ]
-                    ],
-                    "normal_name": "NA24385-BRCA1",
-                    "tumor_inputs": [
-                        [
-                            f"{chr17}/NA12878-NA24385-mixture-BRCA1_R1.fastq.gz",
-                            f"{chr17}/NA12878-NA24385-mixture-BRCA1_R2.fastq.gz",
-                        ]
-                    ],
-                    "tumor_name": "NA12878-NA24385-mixture",
-                    "reference": f"{chr17}/Homo_sapiens_assembly38.chr17.fasta",
-                    "gridss_blacklist": f"{chr17}/consensusBlacklist.hg38.chr17.bed",
-                    "gnomad": f"{chr17}/af-only-gnomad.hg38.BRCA1.vcf.gz",
-                    "gatk_intervals": [f"{chr17}/BRCA1.hg38.bed"],
-                    "known_indels": f"{chr17}/Homo_sapiens_assembly38.known_indels.BRCA1.vcf.gz",
-                    "mills_indels": f"{chr17}/Mills_and_1000G_gold_standard.indels.hg38.BRCA1.vcf.gz",
-                    "snps_1000gp": f"{chr17}/1000G_phase1.snps.high_confidence.hg38.BRCA1.vcf.gz",
-                    "snps_dbsnp": f"{chr17}/Homo_sapiens_assembly38.dbsnp138.BRCA1.vcf.gz",
-                    "cutadapt_adapters": f"{chr17}/contaminant_list.txt",
-                },
-                output=BamBai.basic_test("out_normal_bam", 3265300, 49500)
-                + BamBai.basic_test("out_tumor_bam", 3341700, 49000)
-                + TextFile.basic_test(
-                    "out_normal_performance_summary",
-                    950,
-                    md5="e3205735e5fe8c900f05050f8ed73f19",
-                )
-                + TextFile.basic_test(
-                    "out_tumor_performance_summary",
-                    950,
-                    md5="122bfa2ece90c0f030015feba4ba7d84",
-                )
+                input=self.basic_test_inputs(),
+                output=self.preprocessing_test_outputs()
                 + CompressedVcf.basic_test(
                     "out_variants_gatk",
                     9040,
@@ -305,26 +344,14 @@ class WGSSomaticGATK(WGSSomaticGATKVariantsOnly):
                     ["GATKCommandLine"],
                     "a2e4f96c451754ef8cba80494ed98a70",
                 )
-                + Vcf.basic_test(
-                    "out_variants",
-                    44090,
-                    156,
-                    ["GATKCommandLine"],
-                    "5fc0e861893e0a23f974808265a6917e",
-                )
-                + Array.array_wrapper(
-                    [
-                        Vcf.basic_test(
-                            "out_variants_split",
-                            34390,
-                            147,
-                            ["GATKCommandLine"],
-                            "c083775bc8c49397fb65ec12cd435688",
-                        )
-                    ]
-                )
-                + FastqGzPair.basic_test("out_normal_fastqc_reports", 441500, 439800)
-                + FastqGzPair.basic_test("out_tumor_fastqc_reports", 434900, 440000),
+                # tar pads the archive to (at least) one 10240 byte record, and the index
+                # lists the shards by their position in the scatter
+                + TarFile.basic_test("out_variants_gakt_split", 10240)
+                + TextFile.basic_test(
+                    "out_variants_gakt_split_index",
+                    20,
+                    min_required_content="shards/00001-",
+                ),
             )
         ]
 
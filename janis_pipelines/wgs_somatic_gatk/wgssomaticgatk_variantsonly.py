@@ -6,23 +6,34 @@ from janis_bioinformatics.data_types import (
     Bed,
     File,
     BamBai,
-    CompressedVcf,
     Vcf,
+    CompressedVcf,
 )
-from janis_bioinformatics.tools.bcftools import BcfToolsSort_1_9
+from janis_bioinformatics.tools.bcftools import BcfToolsConcat_1_9
 from janis_bioinformatics.tools.bioinformaticstoolbase import BioinformaticsWorkflow
-from janis_bioinformatics.tools.common import GATKBaseRecalBQSRWorkflow_4_1_3
-from janis_bioinformatics.tools.gatk4 import Gatk4GatherVcfs_4_1_3
-from janis_bioinformatics.tools.htslib import BGZipLatest
+from janis_bioinformatics.tools.common import SplitMultiAllele
+from janis_bioinformatics.tools.gatk4 import (
+    Gatk4BaseRecalibrator_4_1_3,
+    Gatk4ApplyBqsr_4_1_3,
+    GatkMutect2_4_1_3,
+    Gatk4LearnReadOrientationModelLatest,
+    Gatk4GetPileUpSummariesLatest,
+    Gatk4CalculateContaminationLatest,
+    Gatk4FilterMutectCallsLatest,
+)
+from janis_bioinformatics.tools.htslib import TabixLatest
 from janis_bioinformatics.tools.papenfuss import Gridss_2_6_2
 from janis_bioinformatics.tools.pmac import (
     AddBamStatsSomatic_0_1_0,
     GenerateIntervalsByChromosome,
 )
-from janis_bioinformatics.tools.variantcallers import GatkSomaticVariantCaller_4_1_3
+from janis_bioinformatics.tools.vcftools import VcfToolsvcftoolsLatest
 from janis_core import (
     String,
     Array,
+    Boolean,
+    Int,
+    WorkflowBuilder,
     WorkflowMetadata,
     InputDocumentation,
     InputQualityType,
@@ -31,6 +42,13 @@ from janis_core.operators.standard import FirstOperator
 from janis_unix.tools import UncompressArchive
 
 from janis_pipelines.reference import WGS_INPUTS
+from janis_pipelines.tools import (
+    Gatk4SplitIntervals_4_1_3,
+    SliceVcfByIntervals_1_9,
+    TarShards_1_30,
+    ParabricksSomaticVariantCaller_4_0,
+    SortAndCompressVcf_1_9,
+)
 
 INPUT_DOCS = {
     **WGS_INPUTS,
@@ -72,6 +90,25 @@ INPUT_DOCS = {
         "quality": InputQualityType.user,
         "example": "NA12878-normal.bam",
     },
+    "use_gpu": {
+        "doc": "Call somatic variants with the GPU accelerated Parabricks mutectcaller instead of "
+        "scattering GATK Mutect2 across the intervals. This requires the engine to schedule "
+        "the variant calling onto an NVIDIA GPU enabled host. The panel_of_normals is ignored "
+        "by the GPU path, as it can't stage the '.pon' file of a 'pbrun prepon' panel.",
+        "quality": InputQualityType.configuration,
+    },
+    "mutect_scatter_count": {
+        "doc": "The number of evenly balanced shards the GATK intervals are split into (with "
+        "GATK SplitIntervals) for the Mutect2 scatter (or, with use_gpu, the GetPileupSummaries scatter). This "
+        "avoids launching a task for every (potentially tiny) interval provided.",
+        "quality": InputQualityType.configuration,
+    },
+    "final_compression_level": {
+        "doc": "The bgzip compression level (1-9) of the final, merged VCFs. Level 1 is much "
+        "faster than the default (6) for a slightly larger file, set this to 6 if the VCFs "
+        "are to be archived.",
+        "quality": InputQualityType.configuration,
+    },
 }
 
 
@@ -115,6 +152,19 @@ class WGSSomaticGATKVariantsOnly(BioinformaticsWorkflow):
             VcfTabix(optional=True),
             doc=INPUT_DOCS["panel_of_normals"],
         )
+        self.input("use_gpu", Boolean, default=False, doc=INPUT_DOCS["use_gpu"])
+        self.input(
+            "mutect_scatter_count",
+            Int,
+            default=64,
+            doc=INPUT_DOCS["mutect_scatter_count"],
+        )
+        self.input(
+            "final_compression_level",
+            Int,
+            default=1,
+            doc=INPUT_DOCS["final_compression_level"],
+        )
 
     def add_inputs_for_intervals(self):
         self.input("gatk_intervals", Array(Bed), doc=INPUT_DOCS["gatk_intervals"])
@@ -140,51 +190,282 @@ class WGSSomaticGATKVariantsOnly(BioinformaticsWorkflow):
 
         intervals = FirstOperator([self.gatk_intervals, generated_intervals])
 
-        recal_ins = {
-            "reference": self.reference,
+        vc_ins = {
+            "normal_bam": normal_bam_source,
+            "tumor_bam": tumor_bam_source,
+            "normal_name": self.normal_name,
             "intervals": intervals,
+            "reference": self.reference,
             "snps_dbsnp": self.snps_dbsnp,
             "snps_1000gp": self.snps_1000gp,
             "known_indels": self.known_indels,
             "mills_indels": self.mills_indels,
+            "gnomad": self.gnomad,
         }
+
+        self.step(
+            "vc_gatk",
+            self.process_gatk_subpipeline(
+                scatter_count=self.mutect_scatter_count,
+                panel_of_normals=self.panel_of_normals,
+                **vc_ins,
+            ),
+            when=self.use_gpu.negate(),
+        )
+        # Parabricks parallelises Mutect2 across the GPU itself, only the tumor's
+        # pileups (for the contamination) are scattered by interval. It's not given the
+        # panel of normals, see the use_gpu doc
+        self.step(
+            "vc_gatk_gpu",
+            ParabricksSomaticVariantCaller_4_0(
+                tumor_name=self.tumor_name,
+                scatter_count=self.mutect_scatter_count,
+                **vc_ins,
+            ),
+            when=self.use_gpu,
+        )
+
         self.step(
+            "vc_gatk_sort_combined",
+            SortAndCompressVcf_1_9(
+                vcf=FirstOperator([self.vc_gatk.out, self.vc_gatk_gpu.out]),
+                compressionLevel=self.final_compression_level,
+            ),
+        )
+
+    @staticmethod
+    def process_gatk_subpipeline(**connections):
+        w = WorkflowBuilder("somatic_gatk_subpipeline")
+
+        w.input("normal_bam", BamBai)
+        w.input("tumor_bam", BamBai)
+        w.input("normal_name", String)
+        w.input("intervals", Array(Bed))
+        w.input("scatter_count", Int)
+        w.input("reference", FastaWithDict)
+        w.input("snps_dbsnp", VcfTabix)
+        w.input("snps_1000gp", VcfTabix)
+        w.input("known_indels", VcfTabix)
+        w.input("mills_indels", VcfTabix)
+        w.input("gnomad", VcfTabix)
+        w.input("panel_of_normals", VcfTabix(optional=True))
+
+        # rebalance the intervals so the scatter has a fixed number of evenly sized
+        # shards, rather than one task (and JVM startup) for every provided interval.
+        # SplitIntervals (4.1.3) can only balance by length, not weight by coverage, and
+        # the intervals are kept whole: restricting them (eg: to the regions covered in
+        # the normal) would change which variants can be called, not just the balance.
+        w.step(
+            "rebalance_intervals",
+            Gatk4SplitIntervals_4_1_3(
+                reference=w.reference,
+                intervals=w.intervals,
+                scatterCount=w.scatter_count,
+                subdivisionMode="BALANCING_WITHOUT_INTERVAL_SUBDIVISION_WITH_OVERFLOW",
+            ),
+        )
+
+        recal_ins = {
+            "reference": w.reference,
+            "intervals": w.rebalance_intervals.out,
+            "snps_dbsnp": w.snps_dbsnp,
+            "snps_1000gp": w.snps_1000gp,
+            "known_indels": w.known_indels,
+            "mills_indels": w.mills_indels,
+        }
+        w.step(
             "bqsr_normal",
-            GATKBaseRecalBQSRWorkflow_4_1_3(bam=normal_bam_source, **recal_ins),
+            WGSSomaticGATKVariantsOnly.bqsr_subpipeline(bam=w.normal_bam, **recal_ins),
             scatter="intervals",
         )
 
-        self.step(
+        w.step(
             "bqsr_tumor",
-            GATKBaseRecalBQSRWorkflow_4_1_3(bam=tumor_bam_source, **recal_ins),
+            WGSSomaticGATKVariantsOnly.bqsr_subpipeline(bam=w.tumor_bam, **recal_ins),
             scatter="intervals",
         )
 
-        self.step(
+        # Mutect2 and GetPileupSummaries only read the gnomad records of their shard, so
+        # rather than each shard localising the whole resource, slice it once up front
+        w.step(
+            "slice_gnomad",
+            SliceVcfByIntervals_1_9(intervals=w.rebalance_intervals.out, vcf=w.gnomad),
+        )
+
+        w.step(
             "vc_gatk",
-            GatkSomaticVariantCaller_4_1_3(
-                normal_bam=self.bqsr_normal.out,
-                tumor_bam=self.bqsr_tumor.out,
-                normal_name=self.normal_name,
-                intervals=intervals,
-                reference=self.reference,
-                gnomad=self.gnomad,
-                panel_of_normals=self.panel_of_normals,
+            WGSSomaticGATKVariantsOnly.mutect2_subpipeline(
+                normal_bam=w.bqsr_normal.out,
+                tumor_bam=w.bqsr_tumor.out,
+                normal_name=w.normal_name,
+                intervals=w.rebalance_intervals.out,
+                reference=w.reference,
+                gnomad=w.slice_gnomad.out,
+                panel_of_normals=w.panel_of_normals,
             ),
-            scatter=["intervals", "normal_bam", "tumor_bam"],
+            scatter=["intervals", "normal_bam", "tumor_bam", "gnomad"],
         )
 
-        self.step("vc_gatk_merge", Gatk4GatherVcfs_4_1_3(vcfs=self.vc_gatk.out))
-        self.step("vc_gatk_compressvcf", BGZipLatest(file=self.vc_gatk_merge.out))
-        self.step(
-            "vc_gatk_sort_combined",
-            BcfToolsSort_1_9(vcf=self.vc_gatk_compressvcf.out.as_type(CompressedVcf)),
+        # bcftools concat gathers the shards in C, rather than GatherVcfs starting a JVM.
+        # It still parses and re-encodes every record: --naive's block copy needs bgzipped
+        # shards with identical headers, and these shards are plain VCFs.
+        # Without --allow-overlaps it reads the shards one at a time, and there are only
+        # ever scatter_count of them, so it isn't limited by open file descriptors or the
+        # argument length.
+        w.step("vc_gatk_merge", BcfToolsConcat_1_9(vcf=w.vc_gatk.out))
+
+        # publish the unmerged shards as one archive, rather than one small file per
+        # interval for the object store (or shared filesystem) to keep track of
+        w.step("archive_shards", TarShards_1_30(files=w.vc_gatk.out))
+
+        w.output("out", source=w.vc_gatk_merge.out)
+        w.output("out_split", source=w.archive_shards.out)
+        w.output("out_split_index", source=w.archive_shards.out_index)
+
+        return w(**connections)
+
+    @staticmethod
+    def bqsr_subpipeline(**connections):
+        w = WorkflowBuilder("bqsr_subpipeline")
+
+        w.input("bam", BamBai)
+        w.input("intervals", Bed(optional=True))
+        w.input("reference", FastaWithDict)
+        w.input("snps_dbsnp", VcfTabix)
+        w.input("snps_1000gp", VcfTabix)
+        w.input("known_indels", VcfTabix)
+        w.input("mills_indels", VcfTabix)
+
+        w.step(
+            "base_recalibrator",
+            Gatk4BaseRecalibrator_4_1_3(
+                bam=w.bam,
+                intervals=w.intervals,
+                reference=w.reference,
+                knownSites=[
+                    w.snps_dbsnp,
+                    w.snps_1000gp,
+                    w.known_indels,
+                    w.mills_indels,
+                ],
+            ),
         )
-        self.step(
-            "vc_gatk_uncompressvcf",
-            UncompressArchive(file=self.vc_gatk_sort_combined.out),
+        # the recalibrated shard is only read within its scatter (by Mutect2, and
+        # GetPileupSummaries for the tumour), so write it at compression level 1 to save
+        # CPU rather than disk. We keep it as a bam rather than a cram: the shard only
+        # lives for the rest of the scatter, and cram's reference based encoding would
+        # cost more CPU (once to write, and again for each reader) than the bytes it saves.
+        w.step(
+            "apply_bqsr",
+            Gatk4ApplyBqsr_4_1_3(
+                bam=w.bam,
+                intervals=w.intervals,
+                recalFile=w.base_recalibrator.out,
+                reference=w.reference,
+                # compression_level renders samjdk.compress_level, which htsjdk ignores
+                javaOptions=["-Dsamjdk.compression_level=1"],
+            ),
+        )
+
+        w.output("out", source=w.apply_bqsr.out)
+
+        return w(**connections)
+
+    @staticmethod
+    def mutect2_subpipeline(**connections):
+        """
+        The GATK4 SomaticVariantCaller (4.1.3) from janis_bioinformatics, constructed here so
+        we can select the Intel GKL (AVX) PairHMM and Smith-Waterman implementations for Mutect2.
+
+        The bams are expected to already be restricted to the intervals (ApplyBQSR only
+        writes the reads of its shard), so unlike the library workflow we don't use
+        SplitReads to write another copy of them. Likewise gnomad is expected to be the
+        (unindexed) slice of the shard's intervals, rather than the whole resource.
+        """
+        w = WorkflowBuilder("gatk_somatic_variantcaller")
+
+        w.input("normal_bam", BamBai)
+        w.input("tumor_bam", BamBai)
+        w.input("normal_name", String)
+        w.input("intervals", Bed(optional=True))
+        w.input("reference", FastaWithDict)
+        w.input("gnomad", CompressedVcf)
+        w.input("panel_of_normals", VcfTabix(optional=True))
+
+        # gnomad is the (small) slice of this shard, so it's cheap to index here
+        w.step("index_gnomad", TabixLatest(inp=w.gnomad))
+
+        # Mutect2 already picks the fastest (GKL) PairHMM, with a thread per cpu, but its
+        # Smith-Waterman defaults to Java. FASTEST_AVAILABLE lets GKL pick the AVX-512 or
+        # AVX2 kernel that the host supports (falling back to Java otherwise), so we
+        # don't need to check the CPU flags ourselves.
+        w.step(
+            "mutect2",
+            GatkMutect2_4_1_3(
+                normalBams=[w.normal_bam],
+                tumorBams=[w.tumor_bam],
+                normalSample=w.normal_name,
+                intervals=w.intervals,
+                reference=w.reference,
+                germlineResource=w.index_gnomad.out.as_type(VcfTabix),
+                panelOfNormals=w.panel_of_normals,
+                outputPrefix=w.normal_name,
+                smithWaterman="FASTEST_AVAILABLE",
+            ),
+        )
+        w.step(
+            "learnorientationmodel",
+            Gatk4LearnReadOrientationModelLatest(f1r2CountsFiles=w.mutect2.f1f2r_out),
         )
 
+        # calculate contamination and segmentation
+        w.step(
+            "getpileupsummaries",
+            Gatk4GetPileUpSummariesLatest(
+                bam=w.tumor_bam,
+                sites=w.index_gnomad.out.as_type(VcfTabix),
+                intervals=w.intervals,
+            ),
+        )
+        w.step(
+            "calculatecontamination",
+            Gatk4CalculateContaminationLatest(pileupTable=w.getpileupsummaries.out),
+        )
+        w.step(
+            "filtermutect2calls",
+            Gatk4FilterMutectCallsLatest(
+                vcf=w.mutect2.out,
+                reference=w.reference,
+                segmentationFile=w.calculatecontamination.segOut,
+                contaminationTable=w.calculatecontamination.contOut,
+                readOrientationModel=w.learnorientationmodel.out,
+                statsFile=w.mutect2.stats,
+            ),
+        )
+
+        # normalise and filter "PASS" variants
+        w.step("uncompressvcf", UncompressArchive(file=w.filtermutect2calls.out))
+        w.step(
+            "splitnormalisevcf",
+            SplitMultiAllele(
+                vcf=w.uncompressvcf.out.as_type(Vcf), reference=w.reference
+            ),
+        )
+        w.step(
+            "filterpass",
+            VcfToolsvcftoolsLatest(
+                vcf=w.splitnormalisevcf.out,
+                removeFileteredAll=True,
+                recode=True,
+                recodeINFOAll=True,
+            ),
+        )
+
+        w.output("variants", source=w.filtermutect2calls.out)
+        w.output("out", source=w.filterpass.out)
+
+        return w(**connections)
+
     def add_addbamstats(self, normal_bam_source, tumor_bam_source):
         self.step(
             "addbamstats",
@@ -194,7 +475,7 @@ class WGSSomaticGATKVariantsOnly(BioinformaticsWorkflow):
                 normal_bam=normal_bam_source,
                 tumor_bam=tumor_bam_source,
                 reference=self.reference,
-                vcf=self.vc_gatk_uncompressvcf.out.as_type(Vcf),
+                vcf=self.vc_gatk_sort_combined.out_uncompressed,
             ),
         )
 
@@ -207,9 +488,15 @@ class WGSSomaticGATKVariantsOnly(BioinformaticsWorkflow):
         )
         self.output(
             "out_variants_gakt_split",
-            source=self.vc_gatk.out,
+            source=self.vc_gatk.out_split,
+            output_folder=["variants", "byInterval"],
+            doc="Unmerged variants from the GATK caller (by interval), as a tar archive",
+        )
+        self.output(
+            "out_variants_gakt_split_index",
+            source=self.vc_gatk.out_split_index,
             output_folder=["variants", "byInterval"],
-            doc="Unmerged variants from the GATK caller (by interval)",
+            doc="The offset of each interval's variants in the archive",
         )
         self.output(
             "out_variants_bamstats",
@@ -231,8 +518,9 @@ class WGSSomaticGATKVariantsOnly(BioinformaticsWorkflow):
 This is a genomics pipeline to align sequencing data (Fastq pairs) into BAMs:
 
 - Takes raw sequence data in the FASTQ format;
+- Trims adapters and low quality bases, and reports QC metrics using fastp;
 - align to the reference genome using BWA MEM;
-- Marks duplicates using Picard;
+- Marks duplicates using samtools markdup;
 - Call the appropriate somatic variant callers (GATK / Strelka / VarDict);
 - Outputs the final variants in the VCF format.
 